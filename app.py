@@ -1,6 +1,11 @@
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+import plotly.graph_objects as go
 
 # ── 1) CONFIGURACIÓN BÁSICA ─────────────────────────────────────────────────────
 st.set_page_config(
@@ -10,149 +15,290 @@ st.set_page_config(
 st.title("📊 Pronóstico Mensual")
 
 # ── 2) CARGAR DATOS ────────────────────────────────────────────────────────────
-@st.cache_data
+def asegurar_parquet(ruta_archivo: str) -> str:
+    """
+    Convierte el Excel a Parquet (una sola vez) y devuelve la ruta del Parquet.
+    Si el Parquet no existe o es más antiguo que el Excel, se regenera.
+    """
+    ruta_parquet = str(Path(ruta_archivo).with_suffix('.parquet'))
+    if (
+        not os.path.exists(ruta_parquet)
+        or os.path.getmtime(ruta_parquet) < os.path.getmtime(ruta_archivo)
+    ):
+        # Se escribe a un temporal en la misma carpeta y se renombra de forma atómica:
+        # una escritura interrumpida (o concurrente) nunca deja un Parquet truncado
+        fd, ruta_temporal = tempfile.mkstemp(
+            suffix='.parquet.tmp', dir=os.path.dirname(os.path.abspath(ruta_parquet))
+        )
+        os.close(fd)
+        try:
+            (
+                pd.read_excel(ruta_archivo, parse_dates=['FECHA'])
+                .astype({'PAIS': 'category', 'CLIENTE': 'category', 'PRODUCTO': 'category'})
+                .to_parquet(ruta_temporal, engine='pyarrow', compression='zstd')
+            )
+            os.replace(ruta_temporal, ruta_parquet)
+        finally:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+    return ruta_parquet
+
+@st.cache_resource
 def cargar_datos(ruta_archivo: str) -> pd.DataFrame:
     """
-    Lee un CSV o Excel con columnas:
+    Lee un Excel con columnas:
     PAIS | CLIENTE | PRODUCTO | FECHA | TOTAL VENDIDO
-    Devuelve un DataFrame con FECHA en datetime.
+    a través de su copia en Parquet (mucho más rápida de leer que el Excel);
+    si esa copia no se puede generar, lee el Excel directamente.
+    Devuelve un DataFrame con FECHA en datetime, PAIS/CLIENTE/PRODUCTO
+    como categorías y las columnas Mes (int8) y Año (int16).
+    Se cachea como recurso: todas las sesiones comparten el mismo objeto,
+    sin copiarlo ni serializarlo en cada rerun, por lo que NO debe modificarse.
     """
-    # Si tu archivo es Excel, descomenta la siguiente línea y comenta la de CSV:
-    # df = pd.read_excel(ruta_archivo, parse_dates=['FECHA'])
-    df = pd.read_excel(ruta_archivo, parse_dates=['FECHA'])
+    try:
+        ruta_parquet = asegurar_parquet(ruta_archivo)
+    except OSError:
+        # No se pudo escribir el Parquet (p. ej. carpeta de solo lectura):
+        # se lee el Excel directamente; las conversiones de abajo son las mismas
+        ruta_parquet = None
+    if ruta_parquet is not None:
+        df = pd.read_parquet(ruta_parquet, engine='pyarrow')
+    else:
+        df = pd.read_excel(ruta_archivo, parse_dates=['FECHA'])
+    # Las filas sin FECHA no caen en ningún mes, así que se descartan
+    df = df.dropna(subset=['FECHA'])
+    # Columnas de texto repetido como categorías: isin/unique trabajan sobre códigos enteros.
+    # Categorías ordenadas y sin sobrantes: .cat.categories sirve directo como lista de opciones.
+    for c in ('PAIS', 'CLIENTE', 'PRODUCTO'):
+        columna = df[c].astype('category').cat.remove_unused_categories()
+        df[c] = columna.cat.reorder_categories(sorted(columna.cat.categories))
+    # Mes y Año se derivan aquí, una sola vez (claves de agrupación angostas)
+    df['Mes'] = df['FECHA'].dt.month.astype('int8')
+    df['Año'] = df['FECHA'].dt.year.astype('int16')
     return df
 
-# Ajusta la ruta al archivo real (puede ser .csv o .xlsx según tu caso)
+@st.cache_data
+def indexar_opciones(ruta_archivo: str) -> tuple[dict, dict]:
+    """
+    Precalcula (una sola vez) las opciones de los filtros en cascada:
+    - clientes_por_pais:          País → lista ordenada de clientes
+    - productos_por_pais_cliente: (País, Cliente) → lista ordenada de productos
+    Las claves con País o Cliente vacío se conservan para que los productos
+    de esas filas sigan apareciendo al filtrar por solo uno de los dos.
+    """
+    df = cargar_datos(ruta_archivo)
+    clientes_por_pais = (
+        df.dropna(subset=['CLIENTE'])
+        .groupby('PAIS', observed=True)['CLIENTE']
+        .unique()
+        .apply(sorted)
+        .to_dict()
+    )
+    productos_por_pais_cliente = (
+        df.dropna(subset=['PRODUCTO'])
+        .groupby(['PAIS', 'CLIENTE'], observed=True, dropna=False)['PRODUCTO']
+        .unique()
+        .apply(sorted)
+        .to_dict()
+    )
+    return clientes_por_pais, productos_por_pais_cliente
+
+# Ajusta la ruta al archivo Excel real (el .parquet se genera a su lado)
 RUTA_ARCHIVO = "BD_STREAMLIT.xlsx"
 df = cargar_datos(RUTA_ARCHIVO)
+clientes_por_pais, productos_por_pais_cliente = indexar_opciones(RUTA_ARCHIVO)
 
 if df.empty:
     st.error("❌ El DataFrame está vacío. Revisa la ruta o el contenido del archivo.")
     st.stop()
 
-# ── 3) PREPROCESAMIENTO: EXTRAER MES Y AÑO ─────────────────────────────────────
-df['Mes'] = df['FECHA'].dt.month
-df['Año'] = df['FECHA'].dt.year
-
 # ── 4) FILTROS EN CASCADA ───────────────────────────────────────────────────────
 st.markdown("*Filtra tus datos (si no seleccionas nada, se muestra ventas totales):*")
 
-col1, col2, col3 = st.columns(3)
+# País va fuera del formulario: al cambiarlo se refrescan enseguida los clientes
+# disponibles. Cliente y Producto van dentro de un formulario y se aplican juntos
+# al pulsar "Aplicar" (un solo rerun); sus opciones se calculan con la última
+# selección aplicada, que Streamlit guarda en session_state bajo la key de cada widget.
+col1, col_form = st.columns([1, 2])
 
 # 4.1) Primero: FILTRO PAÍS (lista completa de países, SIN DEPENDER DE NADA)
 with col1:
-    todos_paises = sorted(df['PAIS'].dropna().unique())
+    todos_paises = df['PAIS'].cat.categories.tolist()
     sel_paises = st.multiselect(
         label="País(es)",
         options=todos_paises,
-        default=[],
+        key='sel_paises',
         help="Si no seleccionas nada, se usarán todos los países."
     )
 
 # 4.2) Con base en la selección de País, defino qué Clientes mostrar
-# Si no hay selección de País, usamos TODO el df para mirar clientes
+# Si no hay selección de País, mostramos TODOS los clientes
 if sel_paises:
-    df_filtrado_pais = df[df['PAIS'].isin(sel_paises)]
+    clientes_disponibles = sorted(set().union(*(clientes_por_pais.get(p, []) for p in sel_paises)))
 else:
-    df_filtrado_pais = df
-
-with col2:
-    clientes_disponibles = sorted(df_filtrado_pais['CLIENTE'].dropna().unique())
-    sel_clientes = st.multiselect(
-        label="Cliente(s)",
-        options=clientes_disponibles,
-        default=[],
-        help="Si no seleccionas nada, se usarán todos los clientes posibles dentro del/los país(es) seleccionado(s)."
-    )
+    clientes_disponibles = df['CLIENTE'].cat.categories.tolist()
+
+# Si cambió el País, descarto (y aviso) los clientes aplicados que ya no están disponibles
+clientes_validos = set(clientes_disponibles)
+clientes_aplicados = st.session_state.get('sel_clientes', [])
+sel_clientes = [c for c in clientes_aplicados if c in clientes_validos]
+clientes_descartados = [c for c in clientes_aplicados if c not in clientes_validos]
+st.session_state['sel_clientes'] = sel_clientes
 
 # 4.3) Con base en País + Cliente, defino qué Productos mostrar
-# Si no hay selección de Cliente, uso df_filtrado_pais para ver todos los productos
-if sel_clientes:
-    df_filtrado_cliente = df_filtrado_pais[df_filtrado_pais['CLIENTE'].isin(sel_clientes)]
+# Si no hay selección de País ni de Cliente, mostramos TODOS los productos
+if sel_paises or sel_clientes:
+    paises_elegidos, clientes_elegidos = set(sel_paises), set(sel_clientes)
+    productos_disponibles = sorted(set().union(*(
+        productos
+        for (pais, cliente), productos in productos_por_pais_cliente.items()
+        if (not sel_paises or pais in paises_elegidos)
+        and (not sel_clientes or cliente in clientes_elegidos)
+    )))
 else:
-    df_filtrado_cliente = df_filtrado_pais
-
-with col3:
-    productos_disponibles = sorted(df_filtrado_cliente['PRODUCTO'].dropna().unique())
-    sel_productos = st.multiselect(
-        label="Producto(s)",
-        options=productos_disponibles,
-        default=[],
-        help="Si no seleccionas nada, se usarán todos los productos posibles dentro del/los cliente(s) (y país(es)) ya seleccionados."
+    productos_disponibles = df['PRODUCTO'].cat.categories.tolist()
+
+productos_validos = set(productos_disponibles)
+productos_aplicados = st.session_state.get('sel_productos', [])
+sel_productos = [p for p in productos_aplicados if p in productos_validos]
+productos_descartados = [p for p in productos_aplicados if p not in productos_validos]
+st.session_state['sel_productos'] = sel_productos
+
+with col_form, st.form('filtros'):
+    col2, col3 = st.columns(2)
+
+    with col2:
+        sel_clientes = st.multiselect(
+            label="Cliente(s)",
+            options=clientes_disponibles,
+            key='sel_clientes',
+            help="Si no seleccionas nada, se usarán todos los clientes posibles dentro del/los país(es) seleccionado(s)."
+        )
+
+    with col3:
+        sel_productos = st.multiselect(
+            label="Producto(s)",
+            options=productos_disponibles,
+            key='sel_productos',
+            help="Si no seleccionas nada, se usarán todos los productos posibles dentro del/los cliente(s) (y país(es)) ya seleccionados."
+        )
+
+    st.form_submit_button("Aplicar")
+
+if clientes_descartados or productos_descartados:
+    st.warning(
+        "⚠ Se quitaron filtros que no corresponden a la selección actual: "
+        + ", ".join(map(str, clientes_descartados + productos_descartados))
     )
 
-# ── 5) APLICAR FILTROS DEFINITIVOS ──────────────────────────────────────────────
-# Partiendo de df, voy aplicando los filtros en cascada:
-df_filtrado = df.copy()
+# ── 5-8) FILTRAR, AGREGAR Y PROMEDIAR (CACHEADO POR SELECCIÓN) ────────────────
+@st.cache_data(show_spinner=False)
+def agregar_ventas(
+    ruta_archivo: str,
+    paises: tuple,
+    clientes: tuple,
+    productos: tuple,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Aplica los filtros y devuelve:
+    - las ventas mensuales por Año-Mes (con Fecha_Mes, primer día de cada mes)
+    - el promedio histórico por mes (arreglo de 13 posiciones, meses 1..12)
+    Solo depende del archivo y de la selección, así que se cachea por esos
+    valores; el DataFrame se obtiene de cargar_datos (ya cacheado).
+    """
+    df = cargar_datos(ruta_archivo)
+    # 5) Una sola máscara booleana combinada (País & Cliente & Producto) y un único indexado.
+    #    Sin filtros se agrega directamente sobre df (sin copia).
+    if paises or clientes or productos:
+        mask = np.ones(len(df), dtype=bool)
+        if paises:
+            mask &= df['PAIS'].isin(paises).to_numpy()
+        if clientes:
+            mask &= df['CLIENTE'].isin(clientes).to_numpy()
+        if productos:
+            mask &= df['PRODUCTO'].isin(productos).to_numpy()
+        df_filtrado = df[mask]
+    else:
+        df_filtrado = df
+
+    # 6) Agregar ventas mensuales por Mes-Año: clave entera (meses desde enero del primer año)
+    #    y suma por cubetas con np.bincount. El resultado queda ordenado por Año y Mes
+    #    (la gráfica une los puntos en ese orden).
+    anos = df_filtrado['Año'].to_numpy(dtype=np.int32)
+    meses = df_filtrado['Mes'].to_numpy(dtype=np.int32)
+    ano_min = int(anos.min()) if len(anos) else 0
+    clave = (anos - ano_min) * 12 + (meses - 1)
+    ventas = df_filtrado['TOTAL VENDIDO'].to_numpy(dtype=np.float64)
+    ventas = np.where(np.isnan(ventas), 0.0, ventas)   # NaN cuenta como 0 (como en .sum()); ±inf se conserva
+    totales = np.bincount(clave, weights=ventas)
+    presentes = np.flatnonzero(np.bincount(clave))   # solo los Año-Mes con registros
+    ventas_mensuales = pd.DataFrame({
+        'Año': (ano_min + presentes // 12).astype(np.int16),
+        'Mes': (presentes % 12 + 1).astype(np.int8),
+        'Ventas Mensuales': totales[presentes],
+    })
 
-# Filtrar por País (si se seleccionó al menos uno)
-if sel_paises:
-    df_filtrado = df_filtrado[df_filtrado['PAIS'].isin(sel_paises)]
+    # 7) Crear Fecha_Mes (primer día de cada mes) directamente como datetime64:
+    #    meses transcurridos desde 1970-01 → datetime64[M] → datetime64[ns]
+    meses_desde_1970 = (
+        (ventas_mensuales['Año'].to_numpy(dtype=np.int64) - 1970) * 12
+        + ventas_mensuales['Mes'].to_numpy(dtype=np.int64) - 1
+    )
+    ventas_mensuales['Fecha_Mes'] = (
+        meses_desde_1970.astype('datetime64[M]').astype('datetime64[ns]')
+    )
 
-# Filtrar por Cliente (si se seleccionó al menos uno)
-if sel_clientes:
-    df_filtrado = df_filtrado[df_filtrado['CLIENTE'].isin(sel_clientes)]
+    # 8) Promedio histórico por mes (ignorar año), en un arreglo indexado por número
+    #    de mes (posición 0 sin usar); los meses sin datos quedan en 0
+    promedio_mes = (
+        ventas_mensuales
+        .groupby('Mes', observed=True, sort=False)['Ventas Mensuales']
+        .mean()
+    )
+    promedios = np.zeros(13, dtype=np.float64)
+    promedios[promedio_mes.index.to_numpy()] = promedio_mes.to_numpy()
+    return ventas_mensuales, promedios
 
-# Filtrar por Producto (si se seleccionó al menos uno)
-if sel_productos:
-    df_filtrado = df_filtrado[df_filtrado['PRODUCTO'].isin(sel_productos)]
+ventas_mensuales_agrupadas, promedios_por_mes = agregar_ventas(
+    RUTA_ARCHIVO, tuple(sel_paises), tuple(sel_clientes), tuple(sel_productos)
+)
 
-if df_filtrado.empty:
+if ventas_mensuales_agrupadas.empty:
     st.warning("⚠ No hay datos que coincidan con los filtros seleccionados. Ajusta los filtros para ver resultados.")
     st.stop()
 
-# ── 6) AGREGAR VENTAS MENSUALES POR MES-AÑO ────────────────────────────────────
-ventas_mensuales_agrupadas = (
-    df_filtrado
-    .groupby(['Año', 'Mes'], as_index=False)['TOTAL VENDIDO']
-    .sum()
-    .rename(columns={'TOTAL VENDIDO': 'Ventas Mensuales'})
-)
-
-# ── 7) CREAR Fecha_Mes (primer día de cada mes) CORRECTAMENTE ────────────────────
-ventas_mensuales_agrupadas['Fecha_Mes'] = pd.to_datetime({
-    'year':  ventas_mensuales_agrupadas['Año'],
-    'month': ventas_mensuales_agrupadas['Mes'],
-    'day':   1
-})
-
-# ── 8) CALCULAR PROMEDIO HISTÓRICO POR MES (IGNORAR AÑO) ────────────────────────
-promedios_por_mes = (
-    ventas_mensuales_agrupadas
-    .groupby('Mes')['Ventas Mensuales']
-    .mean()
-    .reindex(range(1, 13))   # nos aseguramos de tener índice 1..12
-    .fillna(0)
-)
-
 # ── 9) CONSTRUIR PRONÓSTICO PARA EL PRÓXIMO AÑO ────────────────────────────────
-ultimo_ano = ventas_mensuales_agrupadas['Año'].max()
+ultimo_ano = int(ventas_mensuales_agrupadas['Año'].max())
 proximo_ano = ultimo_ano + 1
 
-meses_futuros = pd.date_range(
-    start=f"{proximo_ano}-01-01",
-    end=f"{proximo_ano}-12-01",
-    freq='MS'
-)
+# Los 12 primeros de mes del año siguiente: enero + 0..11 meses
+meses_futuros = (
+    np.datetime64(f"{proximo_ano}-01", 'M') + np.arange(12)
+).astype('datetime64[ns]')
 
 pronostico_df = pd.DataFrame({
     'Fecha_Mes': meses_futuros,
-    'Mes': meses_futuros.month
+    'Mes': np.arange(1, 13)
 })
-pronostico_df['Pronóstico'] = pronostico_df['Mes'].map(promedios_por_mes)
+pronostico_df['Pronóstico'] = promedios_por_mes[pronostico_df['Mes'].to_numpy()]
 
 # ── 10) TABLA: PROMEDIO HISTÓRICO POR MES ──────────────────────────────────────
 st.subheader("🗒 Promedio Histórico de Ventas por Mes")
 
-tabla_promedios = promedios_por_mes.reset_index().rename(
-    columns={'index': 'Mes', 'Ventas Mensuales': 'Promedio Vendido'}
-)
-mes_a_texto = {
-    1: 'Enero',      2: 'Febrero',   3: 'Marzo',      4: 'Abril',
-    5: 'Mayo',       6: 'Junio',     7: 'Julio',      8: 'Agosto',
-    9: 'Septiembre', 10: 'Octubre',  11: 'Noviembre', 12: 'Diciembre'
-}
-tabla_promedios['Mes'] = tabla_promedios['Mes'].map(mes_a_texto)
+# Número de mes → texto, como arreglo indexado por número de mes (posición 0 sin usar)
+MES_ARR = np.array([
+    '',
+    'Enero',      'Febrero',   'Marzo',      'Abril',
+    'Mayo',       'Junio',     'Julio',      'Agosto',
+    'Septiembre', 'Octubre',   'Noviembre',  'Diciembre',
+], dtype=object)
+# Meses como categoría ordenada (enero < ... < diciembre): ordenan por calendario, no alfabéticamente
+MES_CAT = pd.CategoricalDtype(MES_ARR[1:], ordered=True)
+
+tabla_promedios = pd.DataFrame({
+    'Mes': MES_ARR[1:13],
+    'Promedio Vendido': promedios_por_mes[1:13],
+})
 
 st.dataframe(
     tabla_promedios.style.format({"Promedio Vendido": "{:,.2f}"}),
@@ -162,22 +308,66 @@ st.dataframe(
 # ── 11) GRAFICAR: HISTÓRICO + PRONÓSTICO ───────────────────────────────────────
 st.subheader("📈 Ventas Mensuales Históricas y Pronóstico para el Año Siguiente")
 
-fig = px.line(
-    ventas_mensuales_agrupadas,
-    x='Fecha_Mes',
-    y='Ventas Mensuales',
-    title="Ventas Mensuales Históricas",
-    labels={'Ventas Mensuales': 'Total Vendido', 'Fecha_Mes': 'Fecha'}
-)
+# Por encima de este número de puntos la serie histórica se reduce con LTTB
+MAX_PUNTOS_GRAFICA = 2000
 
-fig.add_scatter(
-    x=pronostico_df['Fecha_Mes'],
-    y=pronostico_df['Pronóstico'],
+def indices_lttb(x: np.ndarray, y: np.ndarray, n_puntos: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: elige n_puntos índices de la serie (x, y)
+    que conservan su forma visual. Siempre incluye el primer y el último punto.
+    """
+    n = len(x)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+
+    # Los puntos intermedios (1..n-2) se reparten en n_puntos-2 cubetas
+    bordes = np.linspace(1, n - 1, n_puntos - 1).astype(np.int64)
+    indices = np.empty(n_puntos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0   # punto elegido en la cubeta anterior
+    for i in range(n_puntos - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        # Vértice C del triángulo: promedio de la cubeta siguiente (o el último punto)
+        if i + 2 < len(bordes):
+            sig_ini, sig_fin = bordes[i + 1], bordes[i + 2]
+            x_c, y_c = x[sig_ini:sig_fin].mean(), y[sig_ini:sig_fin].mean()
+        else:
+            x_c, y_c = x[-1], y[-1]
+        # Área (x2) del triángulo A-B-C para cada candidato B de la cubeta actual
+        areas = np.abs(
+            (x[a] - x_c) * (y[ini:fin] - y[a])
+            - (x[a] - x[ini:fin]) * (y_c - y[a])
+        )
+        a = ini + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+serie_historica = ventas_mensuales_agrupadas
+if len(serie_historica) > MAX_PUNTOS_GRAFICA:
+    idx = indices_lttb(
+        serie_historica['Fecha_Mes'].to_numpy().astype(np.int64).astype(np.float64),
+        serie_historica['Ventas Mensuales'].to_numpy(dtype=np.float64),
+        MAX_PUNTOS_GRAFICA,
+    )
+    serie_historica = serie_historica.iloc[idx]
+
+fig = go.Figure()
+fig.add_trace(go.Scattergl(
+    x=serie_historica['Fecha_Mes'].to_numpy(),
+    y=serie_historica['Ventas Mensuales'].to_numpy(),
+    mode='lines',
+    name="Histórico"
+))
+fig.add_trace(go.Scattergl(
+    x=pronostico_df['Fecha_Mes'].to_numpy(),
+    y=pronostico_df['Pronóstico'].to_numpy(),
     mode='lines+markers',
     name=f"Pronóstico {proximo_ano}"
-)
+))
 
 fig.update_layout(
+    title="Ventas Mensuales Históricas",
     xaxis_title="Fecha (Mes)",
     yaxis_title="Total Vendido",
     legend_title_text="",
@@ -190,32 +380,30 @@ st.plotly_chart(fig, use_container_width=True)
 with st.expander("Ver detalle mensual completo"):
     # —— Serie histórica completa (solo Año, Mes, Ventas Mensuales Totales) ——
     st.write("*Serie histórica completa (suma de ventas por mes-año):*")
-    detalle_historico = ventas_mensuales_agrupadas[['Año', 'Mes', 'Ventas Mensuales']].copy()
-    # Mapeo numérico → texto para el mes
-    detalle_historico['Mes'] = detalle_historico['Mes'].map(mes_a_texto)
-    # Renombramos la columna de Ventas Mensuales
-    detalle_historico = detalle_historico.rename(
-        columns={'Ventas Mensuales': 'Ventas Mensuales Totales'}
-    )
-    # Ordenamos primero por Año y luego por el número de mes (opcional)
-    detalle_historico['MesNumero'] = ventas_mensuales_agrupadas['Mes']
-    detalle_historico = detalle_historico.sort_values(['Año', 'MesNumero'])
-    detalle_historico = detalle_historico.drop(columns=['MesNumero'])
+    # Ya viene ordenada por Año y Mes desde agregar_ventas; el mes pasa a categoría
+    # ordenada (los códigos son el número de mes - 1), así que ordenar por
+    # ['Año', 'Mes'] respeta el calendario sin columnas auxiliares
+    detalle_historico = pd.DataFrame({
+        'Año': ventas_mensuales_agrupadas['Año'],
+        'Mes': pd.Categorical.from_codes(
+            ventas_mensuales_agrupadas['Mes'].to_numpy() - 1, dtype=MES_CAT
+        ),
+        'Ventas Mensuales Totales': ventas_mensuales_agrupadas['Ventas Mensuales'],
+    })
+    # Tabla potencialmente larga: se formatea en el navegador (column_config), no con Styler
     st.dataframe(
-        detalle_historico.style.format({"Ventas Mensuales Totales": "{:,.2f}"}),
-        use_container_width=True
+        detalle_historico,
+        use_container_width=True,
+        column_config={"Ventas Mensuales Totales": st.column_config.NumberColumn(format="%,.2f")}
     )
 
     # —— Pronóstico mes a mes para el año proximo_ano (solo Año, Mes, Pronóstico) ——
     st.write(f"*Pronóstico mes a mes para el año {proximo_ano}:*")
     pron_mostrar = pd.DataFrame({
         'Año': proximo_ano,
-        'Mes': pronostico_df['Fecha_Mes'].dt.month.map(mes_a_texto),
+        'Mes': MES_ARR[pronostico_df['Mes'].to_numpy()],
         f'Pronóstico {proximo_ano}': pronostico_df['Pronóstico']
-    })
-    # (Opcional) Si quieres ordenar por el número de mes:
-    pron_mostrar['MesNumero'] = pronostico_df['Fecha_Mes'].dt.month
-    pron_mostrar = pron_mostrar.sort_values('MesNumero').drop(columns=['MesNumero'])
+    })   # pronostico_df ya está en orden de enero a diciembre
 
     st.dataframe(
         pron_mostrar.style.format({f'Pronóstico {proximo_ano}': "{:,.2f}"}),